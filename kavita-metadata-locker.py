@@ -14,11 +14,28 @@ Command-line Arguments:
     -f/--fields         Comma-separated metadata fields (keys or labels) to lock
     -l/--library-ids    Comma-separated library IDs to process
     -hs/--hide-skipped  Do not print skipped series messages
+    -w/--workers        Number of series processed concurrently (default: 16)
+    --no-cache          Re-check every series instead of trusting the local lock cache
     --version           Show script version and exit
 """
-import requests
+import httpx
+import orjson
 import sys
 import argparse
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import os
+import time
+from email.utils import mktime_tz, parsedate_tz
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import h2  # noqa: F401 - httpcore imports it lazily once a server negotiates HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 __version__ = "2.1.1"
 
 # Kavita API endpoints
@@ -27,6 +44,33 @@ API_LIBRARIES = "/api/Library/libraries"
 API_SERIES_V2 = "/api/Series/v2"
 API_SERIES_METADATA_GET = "/api/Series/metadata"
 API_SERIES_METADATA_POST = "/api/Series/metadata"
+API_SERIES_METADATA_BATCH = "/api/Series/metadata/batch"
+
+# Default number of series processed concurrently (metadata GET + optional POST in flight)
+MAX_WORKERS = 16
+# HTTP status codes that are retried with backoff
+RETRY_STATUSES = [429, 502, 503, 504]
+RETRIES = 3
+RETRY_BACKOFF = 0.3
+# Seconds to wait for the server before a request fails
+REQUEST_TIMEOUT = 30
+# Number of series whose metadata is requested per batch
+BATCH_SIZE = 50
+# Number of buffered per-series output lines written to stdout at once
+LOG_FLUSH_LINES = 100
+# Whether the server accepts batched metadata requests (None until probed)
+_batch_supported = None
+
+# Local cache of lock flags already set on the server: {base_url: {series_id: [lock keys]}}
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "kavita-locker"
+)
+LOCK_CACHE_FILE = os.path.join(CACHE_DIR, "locked.json.gz")
+# Cached JWT tokens: {hash of server/user/API key: {"token": ..., "exp": ...}}
+TOKEN_CACHE_FILE = os.path.join(CACHE_DIR, "token.json")
+# Minimum remaining lifetime (seconds) for a cached token to be reused, so it outlives the run
+TOKEN_MIN_TTL = 3600
 
 # Metadata fields for locking: (Label, data key, lock-flag key)
 # https://www.kavitareader.com/docs/api/#/Series/post_api_Series_metadata
@@ -52,14 +96,103 @@ LOCKABLE_FIELDS = [
     ("Teams", "teams", "teamLocked"),
     ("Locations", "locations", "locationLocked")
 ]
+# Lowercased data keys and labels mapped to their LOCKABLE_FIELDS entry
+FIELD_INDEX = {name.lower(): field for field in LOCKABLE_FIELDS for name in field[:2]}
+ALL_LOCK_KEYS = [lock_key for _, _, lock_key in LOCKABLE_FIELDS]
 
 
-def login_account(base_url: str, username: str, api_key: str) -> str:
+class RetryTransport(httpx.HTTPTransport):
     """
-    Authenticate with Kavita account endpoint to get a JWT token.
+    HTTP transport that retries transient server errors (RETRY_STATUSES),
+    waiting for the server's Retry-After if given and with exponential
+    backoff otherwise. All POSTs used here are idempotent.
+    """
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(RETRIES):
+            response = super().handle_request(request)
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            delay = self.retry_delay(response, attempt)
+            response.close()
+            time.sleep(delay)
+        return super().handle_request(request)
+
+    @staticmethod
+    def retry_delay(response: httpx.Response, attempt: int) -> float:
+        """
+        Return the seconds to wait before the next attempt.
+
+        Parameters:
+        - response: response with a retryable status
+        - attempt: zero-based number of the failed attempt
+
+        Returns:
+        - Delay from the Retry-After header (seconds or HTTP date), else the backoff delay
+        """
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                parsed = parsedate_tz(retry_after)
+                if parsed is not None:
+                    return max(0.0, mktime_tz(parsed) - time.time())
+        return RETRY_BACKOFF * 2 ** attempt
+
+
+def create_client(workers: int = MAX_WORKERS) -> httpx.Client:
+    """
+    Create a shared HTTP client with keep-alive, HTTP/2 multiplexing when
+    the server supports it and h2 is installed, a connection pool sized for
+    the worker threads and retries on transient server errors. Redirects
+    (e.g. a reverse proxy upgrading HTTP to HTTPS) are followed.
+
+    Parameters:
+    - workers: number of threads sharing the client
+
+    Returns:
+    - Configured httpx.Client
+    """
+    limits = httpx.Limits(max_connections=workers, max_keepalive_connections=workers)
+    transport = RetryTransport(http2=HTTP2_AVAILABLE, limits=limits, retries=RETRIES)
+    return httpx.Client(
+        transport=transport,
+        timeout=REQUEST_TIMEOUT,
+        follow_redirects=True,
+        # Request bodies are serialized with orjson and sent as raw bytes
+        headers={"Content-Type": "application/json"}
+    )
+
+
+def build_urls(base_url: str) -> dict:
+    """
+    Build the absolute API endpoint URLs for a Kavita server once.
 
     Parameters:
     - base_url: URL of the Kavita server
+
+    Returns:
+    - Dict mapping endpoint names to absolute URLs
+    """
+    base_url = base_url.rstrip('/')
+    return {
+        "login": base_url + API_LOGIN,
+        "libraries": base_url + API_LIBRARIES,
+        "series": base_url + API_SERIES_V2,
+        "metadata": base_url + API_SERIES_METADATA_GET,
+        "metadata_batch": base_url + API_SERIES_METADATA_BATCH,
+        "metadata_update": base_url + API_SERIES_METADATA_POST
+    }
+
+
+def login_account(client: httpx.Client, urls: dict, username: str, api_key: str) -> str:
+    """
+    Authenticate with Kavita account endpoint to get a JWT token.
+
+    Parameters:
+    - client: shared HTTP client
+    - urls: API endpoint URLs from build_urls()
     - username: Kavita account username
     - api_key: Kavita API key
 
@@ -68,11 +201,10 @@ def login_account(base_url: str, username: str, api_key: str) -> str:
 
     Exits if authentication fails.
     """
-    url = f"{base_url.rstrip('/')}{API_LOGIN}"
     payload = {"username": username, "password": "string", "apiKey": api_key}
-    resp = requests.post(url, json=payload)
+    resp = client.post(urls["login"], content=orjson.dumps(payload))
     resp.raise_for_status()
-    data = resp.json()
+    data = orjson.loads(resp.content)
     token = data.get("token")
     if not token:
         print("Failed to retrieve authentication token.", file=sys.stderr)
@@ -80,33 +212,36 @@ def login_account(base_url: str, username: str, api_key: str) -> str:
     return token
 
 
-def list_libraries(base_url: str, headers: dict) -> list:
+def list_libraries(client: httpx.Client, urls: dict) -> list:
     """
     Retrieve all libraries available on the Kavita server.
 
     Parameters:
-    - base_url: URL of the Kavita server
-    - headers: HTTP headers with Authorization
+    - client: authenticated HTTP client
+    - urls: API endpoint URLs from build_urls()
 
     Returns:
     - List of library objects (dicts)
     """
-    resp = requests.get(f"{base_url.rstrip('/')}{API_LIBRARIES}", headers=headers)
+    resp = client.get(urls["libraries"])
     resp.raise_for_status()
-    return resp.json()
+    return orjson.loads(resp.content)
 
 
-def list_series_for_library(base_url: str, headers: dict, library_id: int) -> list:
+def list_series_for_libraries(client: httpx.Client, urls: dict, library_ids: list) -> dict:
     """
-    Fetch all series IDs in a given library using /api/Series/v2.
+    Fetch all series in the given libraries using a single /api/Series/v2 request.
+
+    The v2 filter does not reliably scope by library, so the response is
+    split by each series' libraryId on the client.
 
     Parameters:
-    - base_url: URL of the Kavita server
-    - headers: HTTP headers with Authorization
-    - library_id: integer ID of the library to filter
+    - client: authenticated HTTP client
+    - urls: API endpoint URLs from build_urls()
+    - library_ids: list of integer library IDs
 
     Returns:
-    - List of series summary objects (dicts)
+    - Dict mapping each library ID to its list of series summary objects (dicts)
     """
     params = {"PageNumber": 0, "PageSize": 0}
     payload = {
@@ -116,63 +251,278 @@ def list_series_for_library(base_url: str, headers: dict, library_id: int) -> li
         "combination": 0,
         "sortOptions": {"sortField": 1, "isAscending": True},
         "limitTo": 0,
-        "libraryIds": [library_id]
+        "libraryIds": library_ids
     }
-    resp = requests.post(
-        f"{base_url.rstrip('/')}{API_SERIES_V2}",
-        headers=headers,
+    resp = client.post(
+        urls["series"],
         params=params,
-        json=payload
+        content=orjson.dumps(payload)
     )
     resp.raise_for_status()
-    return resp.json()
+    series_by_library = {library_id: [] for library_id in library_ids}
+    for series in orjson.loads(resp.content):
+        library_series = series_by_library.get(series['libraryId'])
+        if library_series is not None:
+            library_series.append(series)
+    return series_by_library
 
 
-def get_series_metadata(base_url: str, headers: dict, series_id: int) -> dict:
+def get_series_metadata(client: httpx.Client, urls: dict, series_id: int) -> dict:
     """
     GET full metadata for a specific series.
 
     Parameters:
-    - base_url: URL of the Kavita server
-    - headers: HTTP headers with Authorization
+    - client: authenticated HTTP client
+    - urls: API endpoint URLs from build_urls()
     - series_id: integer ID of the series
 
     Returns:
     - Metadata object (dict) including lock flags and fields
     """
-    resp = requests.get(
-        f"{base_url.rstrip('/')}{API_SERIES_METADATA_GET}",
-        headers=headers,
+    resp = client.get(
+        urls["metadata"],
         params={"seriesId": series_id}
     )
     resp.raise_for_status()
-    return resp.json()
+    return orjson.loads(resp.content)
 
 
-def update_series_metadata(base_url: str, headers: dict, metadata: dict, lock_fields: list):
+def get_series_metadata_batch(client: httpx.Client, urls: dict, series_ids: list, executor: ThreadPoolExecutor) -> dict:
+    """
+    GET full metadata for several series at once.
+
+    Tries the batch endpoint first and remembers if the server rejects it or
+    does not return every requested series; otherwise falls back to concurrent
+    per-series requests on the executor.
+
+    Parameters:
+    - client: authenticated HTTP client
+    - urls: API endpoint URLs from build_urls()
+    - series_ids: list of integer series IDs
+    - executor: thread pool used for the per-series fallback
+
+    Returns:
+    - Dict mapping series ID to its metadata object (dict)
+    """
+    global _batch_supported
+    if _batch_supported is not False:
+        resp = client.post(
+            urls["metadata_batch"],
+            content=orjson.dumps({"seriesIds": series_ids})
+        )
+        # Only an auth failure is fatal; any other rejection means the endpoint is unusable
+        if resp.status_code == 401:
+            resp.raise_for_status()
+        metas = None
+        if not resp.is_error:
+            try:
+                data = orjson.loads(resp.content)
+            except ValueError:
+                data = None
+            if isinstance(data, list) and all(isinstance(m, dict) for m in data):
+                metas = {m.get('seriesId'): m for m in data}
+        if metas is not None and set(series_ids) <= metas.keys():
+            _batch_supported = True
+            return metas
+        _batch_supported = False
+    metas = executor.map(lambda sid: get_series_metadata(client, urls, sid), series_ids)
+    return dict(zip(series_ids, metas))
+
+
+def update_series_metadata(client: httpx.Client, urls: dict, metadata: dict, lock_keys: list):
     """
     Update metadata for a series, setting selected lock flags to True.
 
+    The full metadata object is sent back: Kavita overwrites the series
+    metadata with this payload, so omitted fields would be cleared.
+
     Parameters:
-    - base_url: URL of the Kavita server
-    - headers: HTTP headers with Authorization
+    - client: authenticated HTTP client
+    - urls: API endpoint URLs from build_urls()
     - metadata: dict of existing series metadata
-    - lock_fields: list of tuples defining which fields to lock
+    - lock_keys: list of lock-flag keys to set
 
     Returns:
     - None (raises on HTTP errors)
     """
-    for _, _, lock_key in lock_fields:
-        metadata[lock_key] = True
+    metadata.update(dict.fromkeys(lock_keys, True))
     payload = {"seriesMetadata": metadata}
-    resp = requests.post(
-        f"{base_url.rstrip('/')}{API_SERIES_METADATA_POST}",
-        headers=headers,
-        json=payload
+    resp = client.post(
+        urls["metadata_update"],
+        content=orjson.dumps(payload)
     )
     resp.raise_for_status()
 
 
+def lock_series(client: httpx.Client, urls: dict, meta: dict, checks: list, lock_keys: list) -> tuple:
+    """
+    Lock the selected fields of a series if any of them is unlocked and set.
+
+    Parameters:
+    - client: authenticated HTTP client
+    - urls: API endpoint URLs from build_urls()
+    - meta: dict of existing series metadata
+    - checks: list of (data key, lock-flag key) pairs for the selected fields
+    - lock_keys: list of lock-flag keys to set
+
+    Returns:
+    - Tuple of (updated, locked_keys): whether the series was updated and
+      all lock-flag keys that are now set on the server
+    """
+    needs_lock = any(not meta[lock_key] and meta[field_key] for field_key, lock_key in checks)
+    if needs_lock:
+        update_series_metadata(client, urls, meta, lock_keys)
+    locked_keys = [lock_key for lock_key in ALL_LOCK_KEYS if meta.get(lock_key)]
+    return needs_lock, locked_keys
+
+
+def check_metadata_schema(meta: dict, lock_fields: list) -> list:
+    """
+    Keep only the selected fields whose data key and lock flag the server's metadata contains.
+
+    Parameters:
+    - meta: metadata object (dict) of any series
+    - lock_fields: list of tuples defining which fields to lock
+
+    Returns:
+    - List of supported LOCKABLE_FIELDS entries
+
+    Warns about fields unknown to the server (e.g. older Kavita versions) and
+    exits if none of the selected fields are supported.
+    """
+    supported = [field for field in lock_fields if field[1] in meta and field[2] in meta]
+    missing = [field[0] for field in lock_fields if field not in supported]
+    if missing:
+        print(f"Server does not support locking: {', '.join(missing)}. Skipping.", file=sys.stderr)
+    if not supported:
+        print("No selected fields are supported by the server. Exiting.", file=sys.stderr)
+        sys.exit(1)
+    return supported
+
+
+def flush_log(lines: list):
+    """
+    Write buffered output lines to stdout in a single call and clear the buffer.
+
+    Parameters:
+    - lines: list of output lines
+    """
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+        lines.clear()
+
+
+def load_lock_cache(path: str) -> dict:
+    """
+    Load the gzip-compressed lock cache.
+
+    Parameters:
+    - path: location of the cache file
+
+    Returns:
+    - Cache dict, empty if the file is missing, unreadable or malformed
+    """
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, EOFError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_lock_cache(path: str, cache: dict):
+    """
+    Write the lock cache to disk, warning instead of failing on errors.
+
+    Parameters:
+    - path: location of the cache file
+    - cache: cache dict to persist
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"Could not write lock cache '{path}': {e}", file=sys.stderr)
+
+
+def token_cache_key(base_url: str, username: str, api_key: str) -> str:
+    """
+    Derive the token cache key for a set of credentials without storing the API key.
+
+    Returns:
+    - Hex digest identifying the server, user and API key
+    """
+    return hashlib.sha256(f"{base_url}\0{username}\0{api_key}".encode()).hexdigest()
+
+
+def token_expiry(token: str) -> int:
+    """
+    Read the expiry (exp claim) from a JWT without verifying it.
+
+    Returns:
+    - Expiry as a Unix timestamp, 0 if it cannot be read
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return int(orjson.loads(base64.urlsafe_b64decode(payload)).get("exp", 0))
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return 0
+
+
+def load_cached_token(path: str, key: str):
+    """
+    Return a cached JWT token if it is still valid for at least TOKEN_MIN_TTL seconds.
+
+    Parameters:
+    - path: location of the token cache file
+    - key: cache key from token_cache_key()
+
+    Returns:
+    - Token string, or None if none is cached or it is about to expire
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f).get(key) or {}
+    except (OSError, ValueError, AttributeError):
+        return None
+    if entry.get("exp", 0) - time.time() > TOKEN_MIN_TTL:
+        return entry.get("token")
+    return None
+
+
+def save_cached_token(path: str, key: str, token: str):
+    """
+    Store a JWT token in the token cache, readable only by the current user.
+
+    Parameters:
+    - path: location of the token cache file
+    - key: cache key from token_cache_key()
+    - token: JWT token string
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+        if not isinstance(cache, dict):
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    now = time.time()
+    cache = {k: v for k, v in cache.items() if isinstance(v, dict) and v.get("exp", 0) > now}
+    cache[key] = {"token": token, "exp": token_expiry(token)}
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            # The mode above only applies on creation; tighten an existing file too
+            os.chmod(path, 0o600)
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"Could not write token cache '{path}': {e}", file=sys.stderr)
+
+
 def prompt_lock_fields() -> list:
     """
     Display lockable metadata options and return user selections.
@@ -209,16 +559,13 @@ def parse_field_args(field_args: str) -> list:
     Exits:
         SystemExit if none of the provided fields match.
     """
-    keys = [f.strip().lower() for f in field_args.split(',') if f.strip()]
+    keys = [k for k in (f.strip().lower() for f in field_args.split(',')) if k]
     selected = []
     for key in keys:
-        matched = False
-        for label, data_key, lock_key in LOCKABLE_FIELDS:
-            if key == data_key.lower() or key == label.lower():
-                selected.append((label, data_key, lock_key))
-                matched = True
-                break
-        if not matched:
+        field = FIELD_INDEX.get(key)
+        if field is not None:
+            selected.append(field)
+        else:
             print(f"Unknown field '{key}'. Skipping.", file=sys.stderr)
     if not selected:
         print("No valid fields provided. Exiting.", file=sys.stderr)
@@ -241,8 +588,12 @@ def main():
     parser.add_argument("-f", "--fields", help="Comma-separated metadata fields (keys or labels) to lock")
     parser.add_argument("-l", "--library-ids", help="Comma-separated library IDs to process")
     parser.add_argument("-hs", "--hide-skipped", action="store_true", help="Do not print skipped series messages")
+    parser.add_argument("-w", "--workers", type=int, default=MAX_WORKERS, help=f"Number of series processed concurrently (default: {MAX_WORKERS})")
+    parser.add_argument("--no-cache", action="store_true", help="Re-check every series instead of trusting the local lock cache")
     parser.add_argument('--version', action='version', version=__version__)
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
 
     # Credential input
     if args.url and args.username and args.api_key:
@@ -266,11 +617,28 @@ def main():
             args.hide_skipped = True
         print("\nLogging in…")
 
-    token = login_account(base_url, username, api_key)
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    base_url = base_url.rstrip('/')
+    urls = build_urls(base_url)
+    client = create_client(args.workers)
+
+    # Reuse a cached token when possible; log in again if there is none or it was rejected
+    token_key = token_cache_key(base_url, username, api_key)
+    token = load_cached_token(TOKEN_CACHE_FILE, token_key)
+    libs = None
+    if token:
+        client.headers["Authorization"] = f"Bearer {token}"
+        try:
+            libs = list_libraries(client, urls)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 401:
+                raise
+    if libs is None:
+        token = login_account(client, urls, username, api_key)
+        save_cached_token(TOKEN_CACHE_FILE, token_key, token)
+        client.headers["Authorization"] = f"Bearer {token}"
+        libs = list_libraries(client, urls)
 
     # Library selection
-    libs = list_libraries(base_url, headers)
     if not libs:
         print("No libraries found.", file=sys.stderr)
         sys.exit(1)
@@ -300,34 +668,88 @@ def main():
             print("No valid libraries selected. Exiting.", file=sys.stderr)
             sys.exit(1)
 
+    # Series whose selected lock flags are known to be set are skipped without a request
+    cache = load_lock_cache(LOCK_CACHE_FILE)
+    server_cache = cache.get(base_url)
+    if args.no_cache or not isinstance(server_cache, dict):
+        server_cache = cache[base_url] = {}
+    atexit.register(save_lock_cache, LOCK_CACHE_FILE, cache)
+
     # Process series
     total = locked_count = skipped_count = 0
-
-    for lib in chosen:
-        lib_id = lib['id']
-        print(f"\nProcessing Library: {lib['name']} (ID: {lib_id})")
-        all_series = list_series_for_library(base_url, headers, lib_id)
-        series_list = [s for s in all_series if s.get('libraryId') == lib_id]
-
-        for series in series_list:
-            total += 1
-            sid = series.get('id')
-            title = series.get('name') or series.get('title')
-            meta = get_series_metadata(base_url, headers, sid)
-            needs_lock = False
-            for _, field_key, lock_key in lock_fields:
-                if not meta.get(lock_key) and meta.get(field_key):
-                    needs_lock = True
-                    break
-            if needs_lock:
-                lock_names = ", ".join([label for label,_,_ in lock_fields])
-                print(f"  Locking {lock_names} for '{title}' (ID: {sid})…")
-                update_series_metadata(base_url, headers, meta, lock_fields)
-                locked_count += 1
-            else:
-                skipped_count += 1
-                if not args.hide_skipped:
-                    print(f"  Skipping '{title}': selected fields already locked or empty.")
+    lock_names = ", ".join([label for label,_,_ in lock_fields])
+    checks = [(field_key, lock_key) for _,field_key,lock_key in lock_fields]
+    lock_keys = [lock_key for _,_,lock_key in lock_fields]
+    lock_key_set = set(lock_keys)
+    log_lines = []
+    schema_checked = False
+
+    # Buffered lines are flushed even if a request fails or the run is interrupted
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            series_by_library = list_series_for_libraries(client, urls, [lib['id'] for lib in chosen])
+            for lib in chosen:
+                lib_id = lib['id']
+                print(f"\nProcessing Library: {lib['name']} (ID: {lib_id})")
+
+                pending = []
+                for series in series_by_library[lib_id]:
+                    if lock_key_set.issubset(server_cache.get(str(series.get('id')), ())):
+                        total += 1
+                        skipped_count += 1
+                        if not args.hide_skipped:
+                            title = series.get('name') or series.get('title')
+                            log_lines.append(f"  Skipping '{title}': selected fields already locked (cached).")
+                            if len(log_lines) >= LOG_FLUSH_LINES:
+                                flush_log(log_lines)
+                    else:
+                        pending.append(series)
+
+                for start in range(0, len(pending), BATCH_SIZE):
+                    batch = pending[start:start + BATCH_SIZE]
+                    metas = get_series_metadata_batch(client, urls, [s.get('id') for s in batch], executor)
+                    # Kavita returns every metadata key, so one check allows direct indexing afterwards
+                    if not schema_checked:
+                        supported = check_metadata_schema(next(iter(metas.values())), lock_fields)
+                        if len(supported) < len(lock_fields):
+                            lock_fields = supported
+                            lock_names = ", ".join([label for label,_,_ in lock_fields])
+                            checks = [(field_key, lock_key) for _,field_key,lock_key in lock_fields]
+                            lock_keys = [lock_key for _,_,lock_key in lock_fields]
+                            lock_key_set = set(lock_keys)
+                        schema_checked = True
+
+                    # Updates run concurrently; results are consumed in order. Every finished
+                    # update is reported before the first failure of the batch is re-raised.
+                    futures = [
+                        executor.submit(lock_series, client, urls, metas[s.get('id')], checks, lock_keys)
+                        for s in batch
+                    ]
+                    error = None
+                    for series, future in zip(batch, futures):
+                        try:
+                            locked, locked_keys = future.result()
+                        except Exception as e:
+                            error = error or e
+                            continue
+                        total += 1
+                        sid = series.get('id')
+                        title = series.get('name') or series.get('title')
+                        server_cache[str(sid)] = locked_keys
+                        if locked:
+                            log_lines.append(f"  Locking {lock_names} for '{title}' (ID: {sid})…")
+                            locked_count += 1
+                        else:
+                            skipped_count += 1
+                            if not args.hide_skipped:
+                                log_lines.append(f"  Skipping '{title}': selected fields already locked or empty.")
+                    if error is not None:
+                        raise error
+                    if len(log_lines) >= LOG_FLUSH_LINES:
+                        flush_log(log_lines)
+                flush_log(log_lines)
+    finally:
+        flush_log(log_lines)
 
     print(f"\nProcessed {total} series: Locked {locked_count}, Skipped {skipped_count}.")
 
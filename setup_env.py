@@ -9,12 +9,32 @@ import os
 import sys
 import subprocess
 import argparse
+import shutil
 
 VENV_DIR = ".venv"
 REQUIREMENTS = [
-    "requests"          # HTTP requests
+    "httpx[http2]>=0.27",   # HTTP/2 capable HTTP client
+    "h2>=4",                # HTTP/2 support for httpx (checked explicitly, extras are not)
+    "orjson>=3.9",          # Fast JSON serialization
+    "brotli>=1.1"           # Brotli response decompression
 ]
 
+# Run inside the venv: exits 0 only if every "name>=version" argument is installed and new enough
+CHECK_REQUIREMENTS = """
+import sys
+from importlib.metadata import version, PackageNotFoundError
+def parse(v):
+    return tuple(int(p) for p in v.split('.')[:3] if p.isdigit())
+for req in sys.argv[1:]:
+    name, _, minimum = req.partition('>=')
+    name = name.split('[')[0]
+    try:
+        if parse(version(name)) < parse(minimum):
+            sys.exit(1)
+    except PackageNotFoundError:
+        sys.exit(1)
+"""
+
 def run(cmd, **kwargs):
     return subprocess.check_call(cmd, shell=False, **kwargs)
 
@@ -35,26 +55,57 @@ def get_executable(name):
     else:
         return os.path.join(VENV_DIR, 'bin', name)
 
-def install_requirements(quiet=False):
+def get_pip_version(pip):
+    """Return the (major, minor) version of pip, or (0, 0) if it cannot be determined."""
+    try:
+        out = subprocess.check_output([pip, '--version'], text=True)
+        return tuple(int(part) for part in out.split()[1].split('.')[:2])
+    except (OSError, subprocess.CalledProcessError, IndexError, ValueError):
+        return (0, 0)
+
+def requirements_satisfied(python):
+    """Check without network access whether all requirements are installed in the venv."""
+    try:
+        return subprocess.call(
+            [python, '-c', CHECK_REQUIREMENTS] + REQUIREMENTS,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        ) == 0
+    except OSError:
+        return False
+
+def install_requirements(quiet=False, upgrade=False):
     """Install or update the required packages in the virtual environment."""
     pip = get_executable('pip')
     python = get_executable('python')
+    if not upgrade and requirements_satisfied(python):
+        if not quiet:
+            print("Required packages are already installed.")
+        return
+    output = {'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL} if quiet else {}
+    upgrade_flag = ['--upgrade'] if upgrade else []
+    uv = shutil.which('uv')
+    if uv:
+        # uv resolves and installs much faster than pip and needs no pip upgrade
+        if not quiet:
+            print("Installing/updating required packages with uv...")
+        run([uv, 'pip', 'install', '--python', python] + upgrade_flag + REQUIREMENTS, **output)
+        return
+    if get_pip_version(pip) < (22, 0):
+        if not quiet:
+            print("Upgrading pip...")
+        run([pip, 'install', '--upgrade', 'pip'], **output)
     if not quiet:
-        print("Upgrading pip...")
-        run([pip, 'install', '--upgrade', 'pip'])
         print("Installing/updating required packages...")
-        run([pip, 'install'] + REQUIREMENTS)
-    else:
-        run([pip, 'install', '--upgrade', 'pip'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        run([pip, 'install'] + REQUIREMENTS, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    run([pip, 'install'] + upgrade_flag + REQUIREMENTS, **output)
 
 def main():
     p = argparse.ArgumentParser()
     p.add_argument('-q', '--quiet', action='store_true', help="Suppress most output")
+    p.add_argument('-U', '--upgrade', action='store_true', help="Upgrade packages even if already installed")
     args = p.parse_args()
     quiet = args.quiet
     create_virtualenv(quiet=quiet)
-    install_requirements(quiet=quiet)
+    install_requirements(quiet=quiet, upgrade=args.upgrade)
     print("Bootstrap complete!")
     if not quiet:
         print("To activate the virtual environment, run:")